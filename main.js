@@ -1,7 +1,6 @@
 // Clean WhatsApp Bot using pure Baileys
 // Use hybrid approach - best of all Baileys variants
 const { makeWASocket, DisconnectReason, useMultiFileAuthState, fetchLatestBaileysVersion } = require('./utils/baileys-hybrid');
-const { Boom } = require('@hapi/boom');
 const P = require('pino');
 const fs = require('fs');
 const path = require('path');
@@ -9,6 +8,9 @@ const http = require('http');
 const PluginManager = require('./plugins/pluginManager');
 const MessageUtils = require('./utils/messageUtils');
 
+// JIDs the socket should never process (newsletters and status broadcasts)
+const IGNORED_JID_PATTERN = /(@newsletter|status@broadcast)/;
+
 // Simple spam detection class
 class SpamDetection {
     constructor(options = {}) {
@@ -41,16 +43,26 @@ class WhatsAppBot {
         this.sentMessageIds = new Set();
         this.startTime = Date.now();
         this.healthServer = null;
+        this.stopping = false;
+        this.healthCache = null;
+        this.healthCacheTTL = 1000; // 1 second
         this.hasWelcomeBeenSent = false;
         
         // Load prefix from environment, default to ".", null means no prefix
         this.prefix = process.env.PREFIX === 'null' ? '' : (process.env.PREFIX || '.');
+        this.noPrefix = this.prefix === '';
+        // Verbose per-message logging is opt-in
+        this.debug = process.env.DEBUG === 'true';
         // Owner number will be extracted from credentials
         this.ownerNumber = null;
         
         // Enhanced features with baileys-x
         this.commandCooldown = new Map(); // Anti-spam cooldown
+        this.lastCooldownSweep = 0;
         this.messageCache = new Map(); // Message caching
+        this.groupMetadataCache = new Map(); // Group metadata keyed by JID
+        this.groupMetadataTTL = 30000; // 30 seconds
+        this.maxGroupMetadataEntries = 200;
         this.botDetection = new Set(); // Bot message detection
         this.sessionActive = false;
         
@@ -90,19 +102,19 @@ class WhatsAppBot {
                 fs.mkdirSync(authDir);
             }
 
-            // Load auth state
-            const { state, saveCreds } = await useMultiFileAuthState(authDir);
-            
-            // Get latest Baileys version
-            let version;
-            try {
-                const baileyVersion = await fetchLatestBaileysVersion();
-                version = baileyVersion.version;
-                console.log(`📱 Using Baileys version: ${version.join('.')}`);
-            } catch (error) {
-                console.log('⚠️ Could not fetch latest version, using default');
-                version = [2, 3000, 1023223821];
-            }
+            // Load auth state and fetch the latest Baileys version concurrently
+            const [{ state, saveCreds }, version] = await Promise.all([
+                useMultiFileAuthState(authDir),
+                fetchLatestBaileysVersion()
+                    .then(({ version }) => {
+                        console.log(`📱 Using Baileys version: ${version.join('.')}`);
+                        return version;
+                    })
+                    .catch(() => {
+                        console.log('⚠️ Could not fetch latest version, using default');
+                        return [2, 3000, 1023223821];
+                    })
+            ]);
 
             // Close existing socket if it exists
             if (this.sock) {
@@ -126,8 +138,12 @@ class WhatsAppBot {
                 generateHighQualityLinkPreview: false, // Set to false as per KaizenMFH defaults
                 getMessage: async (key) => {
                     // Try to get message from cache first
-                    if (this.messageCache && this.messageCache.has(key.id)) {
-                        return this.messageCache.get(key.id);
+                    const cached = this.messageCache?.get(key.id);
+                    if (cached) {
+                        // Refresh recency so hot messages survive eviction
+                        this.messageCache.delete(key.id);
+                        this.messageCache.set(key.id, cached);
+                        return cached;
                     }
                     
                     // Return empty message for missing messages
@@ -142,7 +158,7 @@ class WhatsAppBot {
                 shouldIgnoreJid: jid => {
                     // Only ignore newsletters and status broadcasts, not regular chats
                     if (!jid) return false;
-                    return /(@newsletter|status@broadcast)/.test(jid);
+                    return IGNORED_JID_PATTERN.test(jid);
                 },
                 // Connection optimization for KaizenMFH
                 keepAliveIntervalMs: 30000,
@@ -213,7 +229,7 @@ class WhatsAppBot {
         // Handle incoming messages
         this.sock.ev.on('messages.upsert', async (m) => {
             console.log('🔔 Raw message event received:', m?.messages?.length || 0, 'messages');
-            if (m?.messages?.length > 0) {
+            if (this.debug && m?.messages?.length > 0) {
                 console.log('🔔 First message details:', {
                     fromMe: m.messages[0].key.fromMe,
                     remoteJid: m.messages[0].key.remoteJid,
@@ -243,6 +259,15 @@ class WhatsAppBot {
                 antiDeletePlugin.onMessageUpdate(updates);
             }
         });
+
+        // Drop cached group metadata when a group changes
+        this.sock.ev.on('groups.update', (updates) => {
+            updates.forEach(update => this.groupMetadataCache.delete(update.id));
+        });
+
+        this.sock.ev.on('group-participants.update', (update) => {
+            this.groupMetadataCache.delete(update.id);
+        });
     }
 
     async handleConnectionUpdate(update) {
@@ -257,7 +282,10 @@ class WhatsAppBot {
             }
         }
         
-        if (connection === 'close') {
+        if (connection === 'close' && this.stopping) {
+            // Socket closed by stop(), don't schedule a reconnect
+            this.connected = false;
+        } else if (connection === 'close') {
             const shouldReconnect = (lastDisconnect?.error)?.output?.statusCode !== DisconnectReason.loggedOut;
             const statusCode = lastDisconnect?.error?.output?.statusCode;
             
@@ -295,7 +323,9 @@ class WhatsAppBot {
             this.connected = true;
             
             // Initialize message utils with socket
-            this.messageUtils = new MessageUtils(this.sock);
+            if (this.messageUtils?.sock !== this.sock) {
+                this.messageUtils = new MessageUtils(this.sock);
+            }
             
             // Extract owner number from connected socket
             if (this.sock.user && this.sock.user.id && !this.ownerNumber) {
@@ -316,11 +346,10 @@ class WhatsAppBot {
             console.log(`📝 Message updates received: ${messages.length}`);
             
             for (const message of messages) {
-                // Debug: Log incoming message details
-                console.log(`🔍 Processing message from: ${message.key.remoteJid || 'unknown'}`);
-                console.log(`🔍 Message ID: ${message.key.id}`);
-                console.log(`🔍 From me: ${message.key.fromMe}`);
-                console.log(`🔍 Has message content: ${!!message.message}`);
+                // Debug: Log incoming message details in a single write
+                if (this.debug) {
+                    console.log(`🔍 Processing message from: ${message.key.remoteJid || 'unknown'} | ID: ${message.key.id} | From me: ${message.key.fromMe} | Has content: ${!!message.message}`);
+                }
                 
                 // Skip messages sent by the bot itself (but only our own sent messages)
                 if (message.key.fromMe) {
@@ -356,7 +385,7 @@ class WhatsAppBot {
                 // Cache the message for later retrieval
                 if (message.message && message.key.id) {
                     this.messageCache.set(message.key.id, message.message);
-                    // Clean old cache entries (keep only last 1000 messages)
+                    // Evict the least recently used entry (keep only 1000 messages)
                     if (this.messageCache.size > 1000) {
                         const firstKey = this.messageCache.keys().next().value;
                         this.messageCache.delete(firstKey);
@@ -373,22 +402,30 @@ class WhatsAppBot {
 
                 // Extract message data
                 const messageData = this.parseMessage(message);
-                console.log(`🔍 Parsed message data:`, messageData ? {
-                    from: messageData.from,
-                    body: messageData.body,
-                    hasBody: !!messageData.body
-                } : 'null');
+                if (this.debug) {
+                    console.log(`🔍 Parsed message data:`, messageData ? {
+                        from: messageData.from,
+                        body: messageData.body,
+                        hasBody: !!messageData.body
+                    } : 'null');
+                }
                 
                 if (messageData && messageData.body) {
-                    console.log(`📨 Message from ${messageData.from}: ${messageData.body}`);
+                    if (this.debug) {
+                        console.log(`📨 Message from ${messageData.from}: ${messageData.body}`);
+                    }
 
                     // Check if it's a command
                     const isCmd = this.isCommand(messageData.body);
-                    console.log(`🔍 Is command check: ${isCmd} (prefix: "${this.prefix}")`);
+                    if (this.debug) {
+                        console.log(`🔍 Is command check: ${isCmd} (prefix: "${this.prefix}")`);
+                    }
                     
                     if (isCmd) {
                         const command = this.extractCommand(messageData.body);
-                        console.log(`🎯 Extracted command: "${command}"`);
+                        if (this.debug) {
+                            console.log(`🎯 Extracted command: "${command}"`);
+                        }
                         
                         // Apply spam detection
                         const isSpam = this.spam.detection(this.sock, message, {
@@ -522,17 +559,17 @@ class WhatsAppBot {
     isCommand(text) {
         if (!text) return false;
         
-        if (this.prefix === 'null' || this.prefix === null || this.prefix === '') {
-            // No prefix mode - check if message starts with known command
-            const commands = this.pluginManager ? this.pluginManager.getCommandList() : [];
-            return commands.some(cmd => text.toLowerCase().startsWith(cmd.toLowerCase()));
+        if (this.noPrefix) {
+            // No prefix mode - check if the first word is a known command
+            const firstWord = text.split(' ', 1)[0].toLowerCase();
+            return !!this.pluginManager?.getPlugin(firstWord);
         }
         
         return text.startsWith(this.prefix);
     }
 
     extractCommand(text) {
-        if (this.prefix === 'null' || this.prefix === null || this.prefix === '') {
+        if (this.noPrefix) {
             // No prefix mode
             return text.split(' ')[0].toLowerCase();
         } else {
@@ -588,10 +625,15 @@ class WhatsAppBot {
 
     updateCooldown(sender, command) {
         const cooldownKey = `${sender}-${command}`;
-        this.commandCooldown.set(cooldownKey, Date.now());
+        const now = Date.now();
+        this.commandCooldown.set(cooldownKey, now);
         
-        // Clean old cooldowns (older than 1 minute)
-        const oneMinuteAgo = Date.now() - 60000;
+        // Clean old cooldowns (older than 1 minute), at most once a minute
+        const oneMinuteAgo = now - 60000;
+        if (this.lastCooldownSweep > oneMinuteAgo) {
+            return;
+        }
+        this.lastCooldownSweep = now;
         for (const [key, timestamp] of this.commandCooldown.entries()) {
             if (timestamp < oneMinuteAgo) {
                 this.commandCooldown.delete(key);
@@ -734,7 +776,23 @@ class WhatsAppBot {
                 return null;
             }
 
+            const cached = this.groupMetadataCache.get(groupJid);
+            if (cached) {
+                if ((Date.now() - cached.fetched) < this.groupMetadataTTL) {
+                    return cached.metadata;
+                }
+                this.groupMetadataCache.delete(groupJid);
+            }
+
             const metadata = await this.sock.groupMetadata(groupJid);
+
+            // Evict the oldest entry once the cap is reached
+            this.groupMetadataCache.delete(groupJid);
+            if (this.groupMetadataCache.size >= this.maxGroupMetadataEntries) {
+                const oldest = this.groupMetadataCache.keys().next().value;
+                this.groupMetadataCache.delete(oldest);
+            }
+            this.groupMetadataCache.set(groupJid, { metadata, fetched: Date.now() });
             return metadata;
 
         } catch (error) {
@@ -753,17 +811,17 @@ class WhatsAppBot {
 
 ⏰ Connection Time: ${new Date().toLocaleString()}
 📱 Bot Status: Online and Ready  
-🔧 Command Prefix: ${this.prefix === 'null' || this.prefix === '' ? 'No prefix required' : this.prefix}
+🔧 Command Prefix: ${this.noPrefix ? 'No prefix required' : this.prefix}
 🔌 Plugins: ${this.pluginManager ? this.pluginManager.loadedCount : 0} loaded
 📚 Library: Pure Baileys
 🛡️ Features: Spam detection, interactive messages
 
 📋 Available Commands:
-${this.prefix === 'null' || this.prefix === '' ? '' : this.prefix}menu - Show all commands
-${this.prefix === 'null' || this.prefix === '' ? '' : this.prefix}ping - Check bot status
-${this.prefix === 'null' || this.prefix === '' ? '' : this.prefix}help - Get help information
-${this.prefix === 'null' || this.prefix === '' ? '' : this.prefix}buttons - Interactive buttons demo
-${this.prefix === 'null' || this.prefix === '' ? '' : this.prefix}list - Interactive list demo
+${this.prefix}menu - Show all commands
+${this.prefix}ping - Check bot status
+${this.prefix}help - Get help information
+${this.prefix}buttons - Interactive buttons demo
+${this.prefix}list - Interactive list demo
 
 🚀 Bot is ready to receive commands!`;
 
@@ -783,26 +841,91 @@ ${this.prefix === 'null' || this.prefix === '' ? '' : this.prefix}list - Interac
         }
     }
 
+    // Serialized health status buffer, reused for a second unless the state changes
+    getHealthPayload() {
+        const now = Date.now();
+        const plugins = this.pluginManager ? this.pluginManager.loadedCount : 0;
+        const cache = this.healthCache;
+
+        if (cache && cache.connected === this.connected && cache.plugins === plugins &&
+            (now - cache.built) < this.healthCacheTTL) {
+            return cache.body;
+        }
+
+        const body = Buffer.from(JSON.stringify({
+            status: 'healthy',
+            connected: this.connected,
+            timestamp: new Date(now).toISOString(),
+            plugins,
+            library: '@neoxr/wb with Baileys',
+            uptime: now - this.startTime
+        }));
+        this.healthCache = { body, connected: this.connected, plugins, built: now };
+        return body;
+    }
+
+    // Release the health server and WhatsApp socket so the process can exit cleanly
+    stop(timeout = 3000) {
+        this.stopping = true;
+        const closing = [];
+
+        if (this.healthServer) {
+            const server = this.healthServer;
+            this.healthServer = null;
+            closing.push(new Promise(resolve => server.close(() => resolve())));
+            if (server.closeAllConnections) {
+                server.closeAllConnections();
+            }
+        }
+
+        if (this.sock) {
+            try {
+                this.sock.end();
+            } catch (error) {
+                console.error('❌ Error closing socket:', error);
+            }
+            this.sock = null;
+        }
+
+        // Don't let a stuck connection hold up shutdown
+        return Promise.race([
+            Promise.all(closing),
+            new Promise(resolve => setTimeout(resolve, timeout).unref())
+        ]);
+    }
+
     startHealthServer() {
+        // initialize() runs again on every reconnect, keep the first server
+        if (this.healthServer) {
+            return;
+        }
+
         try {
             let port = process.env.PORT || 8080;
             
+            const healthRoute = (res) => {
+                const body = this.getHealthPayload();
+                res.writeHead(200, {
+                    'Content-Type': 'application/json',
+                    'Content-Length': body.length
+                });
+                res.end(body);
+            };
+            const routes = new Map([
+                ['/', healthRoute],
+                ['/health', healthRoute]
+            ]);
+
             const server = http.createServer((req, res) => {
-                if (req.url === '/health' || req.url === '/') {
-                    res.writeHead(200, { 'Content-Type': 'application/json' });
-                    res.end(JSON.stringify({
-                        status: 'healthy',
-                        connected: this.connected,
-                        timestamp: new Date().toISOString(),
-                        plugins: this.pluginManager ? this.pluginManager.loadedCount : 0,
-                        library: '@neoxr/wb with Baileys',
-                        uptime: Date.now() - this.startTime
-                    }));
+                const route = routes.get(req.url);
+                if (route) {
+                    route(res);
                 } else {
                     res.writeHead(404, { 'Content-Type': 'text/plain' });
                     res.end('Not Found');
                 }
             });
+            this.healthServer = server;
 
             server.on('error', (err) => {
                 if (err.code === 'EADDRINUSE') {
@@ -829,12 +952,11 @@ const bot = new WhatsAppBot();
 bot.initialize();
 
 // Handle graceful shutdown
-process.on('SIGINT', () => {
+const shutdown = async () => {
     console.log('\n🛑 Shutting down WhatsApp Bot...');
+    await bot.stop();
     process.exit(0);
-});
+};
 
-process.on('SIGTERM', () => {
-    console.log('\n🛑 Shutting down WhatsApp Bot...');
-    process.exit(0);
-});
\ No newline at end of file
+process.once('SIGINT', shutdown);
+process.once('SIGTERM', shutdown);
\ No newline at end of file
@@ -1,3 +1,8 @@
+const { downloadMediaMessage } = require('../utils/baileys-hybrid');
+
+const VALID_ACTIONS = new Set(['on', 'off']);
+const VALID_TYPES = new Set(['pm', 'chat']);
+
 class AntiDeletePlugin {
     constructor(bot) {
         this.bot = bot;
@@ -57,7 +62,7 @@ class AntiDeletePlugin {
             const action = args[0]?.toLowerCase();
             const type = args[1]?.toLowerCase();
 
-            if (!['on', 'off'].includes(action) || !['pm', 'chat'].includes(type)) {
+            if (!VALID_ACTIONS.has(action) || !VALID_TYPES.has(type)) {
                 if (this.ownerJid) {
                     await this.bot.sendMessage(this.ownerJid, '❌ Invalid command. Use: .antidelete on/off pm/chat');
                 }
@@ -278,8 +283,6 @@ class AntiDeletePlugin {
 
     async forwardMedia(mediaContent) {
         try {
-            const { downloadMediaMessage } = require('../utils/baileys-hybrid');
-            
             // Create message structure for download
             const messageForDownload = {
                 key: mediaContent.key,
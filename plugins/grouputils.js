@@ -54,8 +54,8 @@ class GroupUtilsPlugin {
             }
 
             // Get group metadata to fetch all participants
-            const groupMetadata = await this.bot.sock.groupMetadata(groupId);
-            const participants = groupMetadata.participants;
+            const groupMetadata = await this.bot.getGroupMetadata(groupId);
+            const participants = groupMetadata?.participants;
 
             if (!participants || participants.length === 0) {
                 await this.bot.sendMessage(groupId, '❌ Could not fetch group members');
@@ -94,8 +94,8 @@ class GroupUtilsPlugin {
             }
 
             // Get group metadata to fetch all participants
-            const groupMetadata = await this.bot.sock.groupMetadata(groupId);
-            const participants = groupMetadata.participants;
+            const groupMetadata = await this.bot.getGroupMetadata(groupId);
+            const participants = groupMetadata?.participants;
 
             if (!participants || participants.length === 0) {
                 await this.bot.sendMessage(groupId, '❌ Could not fetch group members');
@@ -144,7 +144,7 @@ class GroupUtilsPlugin {
             }
 
             // Get group metadata
-            const groupMetadata = await this.bot.sock.groupMetadata(groupId);
+            const groupMetadata = await this.bot.getGroupMetadata(groupId);
             
             // Determine target user - either replied user or command sender
             let targetUser = messageData.sender;
@@ -157,7 +157,7 @@ class GroupUtilsPlugin {
             }
             
             // Find target participant in group
-            const participant = groupMetadata.participants.find(p => p.id === targetUser);
+            const participant = groupMetadata?.participants?.find(p => p.id === targetUser);
             
             if (!participant) {
                 await this.bot.sendMessage(groupId, '❌ User not found in this group');
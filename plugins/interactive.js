@@ -1,29 +1,112 @@
 const MessageUtils = require('../utils/messageUtils');
 
+// Static demo payloads, built once at load time
+const DEMO_BUTTONS = Object.freeze([
+    { id: 'like', text: '👍 Like' },
+    { id: 'share', text: '📤 Share' },
+    { id: 'save', text: '💾 Save' },
+    { id: 'copy_demo', text: '📋 Copy Code' }
+]);
+
+const DEMO_LIST_SECTIONS = Object.freeze([
+    {
+        title: "🍕 Food Menu",
+        rows: [
+            { id: 'pizza', title: 'Pizza Margherita', description: 'Classic Italian pizza - $12.99' },
+            { id: 'burger', title: 'Cheeseburger', description: 'Juicy beef burger - $9.99' },
+            { id: 'pasta', title: 'Spaghetti Carbonara', description: 'Creamy pasta dish - $11.99' }
+        ]
+    },
+    {
+        title: "🥤 Beverages",
+        rows: [
+            { id: 'coke', title: 'Coca Cola', description: 'Refreshing cold drink - $2.99' },
+            { id: 'coffee', title: 'Espresso', description: 'Strong Italian coffee - $3.99' },
+            { id: 'juice', title: 'Orange Juice', description: 'Fresh squeezed - $4.99' }
+        ]
+    }
+]);
+
+const DEMO_CAROUSEL_CARDS = Object.freeze([
+    {
+        id: 'web_dev',
+        title: '🌐 Web Development',
+        subtitle: 'Frontend & Backend',
+        description: 'Learn HTML, CSS, JavaScript, React, Node.js and more'
+    },
+    {
+        id: 'mobile_dev',
+        title: '📱 Mobile Development',
+        subtitle: 'iOS & Android',
+        description: 'Build native and cross-platform mobile applications'
+    },
+    {
+        id: 'ai_ml',
+        title: '🤖 AI & Machine Learning',
+        subtitle: 'Artificial Intelligence',
+        description: 'Explore neural networks, deep learning, and AI algorithms'
+    },
+    {
+        id: 'devops',
+        title: '⚙️ DevOps',
+        subtitle: 'Development Operations',
+        description: 'Master CI/CD, Docker, Kubernetes, and cloud platforms'
+    }
+]);
+
+const DEMO_QUICK_REPLIES = Object.freeze([
+    { id: 'yes', text: '✅ Yes' },
+    { id: 'no', text: '❌ No' },
+    { id: 'maybe', text: '🤔 Maybe Later' }
+]);
+
+const DEMO_CONTACTS = Object.freeze([
+    {
+        name: "WhatsApp Bot Support",
+        number: "1234567890"
+    }
+]);
+
+const INTERACTIVE_MENU_SECTIONS = Object.freeze([
+    {
+        title: "🎮 Interactive Demos",
+        rows: [
+            { id: 'demo_buttons', title: 'Button Messages', description: 'Test interactive buttons' },
+            { id: 'demo_list', title: 'List Messages', description: 'Browse through menu lists' },
+            { id: 'demo_poll', title: 'Poll Messages', description: 'Create voting polls' },
+            { id: 'demo_carousel', title: 'Carousel Messages', description: 'Swipeable card layouts' }
+        ]
+    },
+    {
+        title: "📱 Media & Contact",
+        rows: [
+            { id: 'demo_quick', title: 'Quick Replies', description: 'Fast response buttons' },
+            { id: 'demo_location', title: 'Location Sharing', description: 'Send location coordinates' },
+            { id: 'demo_contact', title: 'Contact Cards', description: 'Share contact information' }
+        ]
+    }
+]);
+
 class InteractivePlugin {
     constructor(bot) {
         this.bot = bot;
-        this.messageUtils = null; // Will be initialized when bot socket is ready
+        this.messageUtils = null; // Created on first use once the bot socket exists
         this.name = 'interactive';
         this.description = 'Enhanced interactive messages with @neoxr/wb features';
         this.commands = ['buttons', 'list', 'poll', 'carousel', 'quick', 'location', 'contact'];
         this.emoji = '🎮';
-        
-        // Initialize messageUtils when socket becomes available
-        this.initializeMessageUtils();
     }
 
-    initializeMessageUtils() {
-        // Check periodically for socket availability
-        const checkSocket = () => {
-            if (this.bot.sock && !this.messageUtils) {
-                this.messageUtils = new MessageUtils(this.bot.sock);
-                console.log('🎮 Interactive plugin initialized with socket');
-            } else if (!this.bot.sock) {
-                setTimeout(checkSocket, 1000);
-            }
-        };
-        checkSocket();
+    // Lazily bind messageUtils to the current socket (rebinds after a reconnect)
+    ensureMessageUtils() {
+        if (this.bot.sock && this.messageUtils?.sock !== this.bot.sock) {
+            // Share the bot's instance when it is already bound to the live socket
+            this.messageUtils = this.bot.messageUtils?.sock === this.bot.sock
+                ? this.bot.messageUtils
+                : new MessageUtils(this.bot.sock);
+            console.log('🎮 Interactive plugin initialized with socket');
+        }
+        return this.messageUtils;
     }
 
     async execute(command, messageData, args) {
@@ -32,11 +115,6 @@ class InteractivePlugin {
                 return await this.bot.sendMessage(messageData.from, 'Bot is not connected to WhatsApp');
             }
 
-            // Ensure messageUtils is initialized
-            if (!this.messageUtils && this.bot.sock) {
-                this.messageUtils = new MessageUtils(this.bot.sock);
-            }
-
             switch (command) {
                 case 'buttons':
                     return await this.sendButtonDemo(messageData);
@@ -69,18 +147,11 @@ class InteractivePlugin {
     }
 
     async sendButtonDemo(messageData) {
-        const buttons = [
-            { id: 'like', text: '👍 Like' },
-            { id: 'share', text: '📤 Share' },
-            { id: 'save', text: '💾 Save' },
-            { id: 'copy_demo', text: '📋 Copy Code' }
-        ];
-
         console.log('🎮 Sending enhanced interactive button demo...');
-        await this.messageUtils.sendButtonMessage(
+        await this.ensureMessageUtils().sendButtonMessage(
             messageData.from,
             "🎮 Enhanced Interactive Buttons Demo\n\nTesting hybrid functionality with multiple fallbacks:\n\n✨ Features:\n• Native flow buttons (priority)\n• Standard button fallback\n• Text menu final fallback\n\nChoose an action below:",
-            buttons,
+            DEMO_BUTTONS,
             { footer: 'Hybrid Interactive System v2.0' }
         );
 
@@ -88,30 +159,11 @@ class InteractivePlugin {
     }
 
     async sendListDemo(messageData) {
-        const sections = [
-            {
-                title: "🍕 Food Menu",
-                rows: [
-                    { id: 'pizza', title: 'Pizza Margherita', description: 'Classic Italian pizza - $12.99' },
-                    { id: 'burger', title: 'Cheeseburger', description: 'Juicy beef burger - $9.99' },
-                    { id: 'pasta', title: 'Spaghetti Carbonara', description: 'Creamy pasta dish - $11.99' }
-                ]
-            },
-            {
-                title: "🥤 Beverages",
-                rows: [
-                    { id: 'coke', title: 'Coca Cola', description: 'Refreshing cold drink - $2.99' },
-                    { id: 'coffee', title: 'Espresso', description: 'Strong Italian coffee - $3.99' },
-                    { id: 'juice', title: 'Orange Juice', description: 'Fresh squeezed - $4.99' }
-                ]
-            }
-        ];
-
-        await this.messageUtils.sendListMessage(
+        await this.ensureMessageUtils().sendListMessage(
             messageData.from,
             "🛒 Restaurant Menu",
             "Browse our delicious menu options below:",
-            sections,
+            DEMO_LIST_SECTIONS,
             "View Menu"
         );
 
@@ -119,7 +171,7 @@ class InteractivePlugin {
     }
 
     async sendPollDemo(messageData) {
-        await this.messageUtils.sendPoll(
+        await this.ensureMessageUtils().sendPoll(
             messageData.from,
             "🗳️ What's your favorite programming language?",
             ["JavaScript", "Python", "Java", "C++", "Go", "Rust"],
@@ -130,53 +182,20 @@ class InteractivePlugin {
     }
 
     async sendCarouselDemo(messageData) {
-        const cards = [
-            {
-                id: 'web_dev',
-                title: '🌐 Web Development',
-                subtitle: 'Frontend & Backend',
-                description: 'Learn HTML, CSS, JavaScript, React, Node.js and more'
-            },
-            {
-                id: 'mobile_dev',
-                title: '📱 Mobile Development',
-                subtitle: 'iOS & Android',
-                description: 'Build native and cross-platform mobile applications'
-            },
-            {
-                id: 'ai_ml',
-                title: '🤖 AI & Machine Learning',
-                subtitle: 'Artificial Intelligence',
-                description: 'Explore neural networks, deep learning, and AI algorithms'
-            },
-            {
-                id: 'devops',
-                title: '⚙️ DevOps',
-                subtitle: 'Development Operations',
-                description: 'Master CI/CD, Docker, Kubernetes, and cloud platforms'
-            }
-        ];
-
-        await this.messageUtils.sendCarouselMessage(
+        await this.ensureMessageUtils().sendCarouselMessage(
             messageData.from,
             "🎓 Tech Learning Paths",
-            cards
+            DEMO_CAROUSEL_CARDS
         );
 
         return true;
     }
 
     async sendQuickReplyDemo(messageData) {
-        const quickReplies = [
-            { id: 'yes', text: '✅ Yes' },
-            { id: 'no', text: '❌ No' },
-            { id: 'maybe', text: '🤔 Maybe Later' }
-        ];
-
-        await this.messageUtils.sendQuickReplyMessage(
+        await this.ensureMessageUtils().sendQuickReplyMessage(
             messageData.from,
             "❓ Quick Reply Demo\n\nWould you like to receive notifications about new features?",
-            quickReplies,
+            DEMO_QUICK_REPLIES,
             { footer: 'Choose your preference' }
         );
 
@@ -185,7 +204,7 @@ class InteractivePlugin {
 
     async sendLocationDemo(messageData) {
         // Example: Sending location of Times Square, New York
-        await this.messageUtils.sendLocation(
+        await this.ensureMessageUtils().sendLocation(
             messageData.from,
             40.7580,
             -73.9855,
@@ -198,45 +217,18 @@ class InteractivePlugin {
     }
 
     async sendContactDemo(messageData) {
-        const contacts = [
-            {
-                name: "WhatsApp Bot Support",
-                number: "1234567890"
-            }
-        ];
-
-        await this.messageUtils.sendContact(messageData.from, contacts);
+        await this.ensureMessageUtils().sendContact(messageData.from, DEMO_CONTACTS);
         await this.bot.sendMessage(messageData.from, "📞 Contact Demo\n\nHere's a sample contact card!");
 
         return true;
     }
 
     async sendInteractiveMenu(messageData) {
-        const sections = [
-            {
-                title: "🎮 Interactive Demos",
-                rows: [
-                    { id: 'demo_buttons', title: 'Button Messages', description: 'Test interactive buttons' },
-                    { id: 'demo_list', title: 'List Messages', description: 'Browse through menu lists' },
-                    { id: 'demo_poll', title: 'Poll Messages', description: 'Create voting polls' },
-                    { id: 'demo_carousel', title: 'Carousel Messages', description: 'Swipeable card layouts' }
-                ]
-            },
-            {
-                title: "📱 Media & Contact",
-                rows: [
-                    { id: 'demo_quick', title: 'Quick Replies', description: 'Fast response buttons' },
-                    { id: 'demo_location', title: 'Location Sharing', description: 'Send location coordinates' },
-                    { id: 'demo_contact', title: 'Contact Cards', description: 'Share contact information' }
-                ]
-            }
-        ];
-
-        await this.messageUtils.sendListMessage(
+        await this.ensureMessageUtils().sendListMessage(
             messageData.from,
             "🎮 Interactive Features",
             "Explore advanced WhatsApp message types:",
-            sections,
+            INTERACTIVE_MENU_SECTIONS,
             "Try Features"
         );
 
@@ -245,9 +237,9 @@ class InteractivePlugin {
 
     // Handle interactive responses
     async handleInteractiveResponse(message, responseData) {
+        const from = message.key.remoteJid;
         try {
             const { type, id, text } = responseData;
-            const from = message.key.remoteJid;
 
             console.log('🎮 Interactive plugin handling response:', { type, id, text });
 
@@ -262,7 +254,7 @@ class InteractivePlugin {
                     await this.bot.sendMessage(from, "💾 Message saved to your favorites! Enhanced buttons are working!");
                     break;
                 case 'copy_demo':
-                    await this.messageUtils.sendCopyCodeMessage(
+                    await this.ensureMessageUtils().sendCopyCodeMessage(
                         from,
                         "📋 Copy Code Demo\n\nHere's sample code you can copy:",
                         "const bot = new WhatsAppBot();\nbot.sendInteractiveMessage(jid, options);",
@@ -5,12 +5,14 @@ class MenuPlugin {
         this.description = 'Shows bot command menu and help information';
         this.commands = ['menu', 'help', 'commands'];
         this.emoji = '📋';
+        this.menuCache = null;
+        this.menuCacheKey = null;
     }
 
     async execute(messageData, command, args) {
         try {
             // Show menu with all available commands
-            const menuMessage = this.formatMenu();
+            const menuMessage = this.getMenu();
             await this.bot.sendMessage(messageData.from, menuMessage);
             return true;
         } catch (error) {
@@ -19,6 +21,16 @@ class MenuPlugin {
         }
     }
 
+    // Rebuild the menu only when the prefix or plugin count changes
+    getMenu() {
+        const key = `${this.bot.prefix || ''}:${this.bot.plugins ? this.bot.plugins.size : 0}`;
+        if (this.menuCacheKey !== key) {
+            this.menuCache = this.formatMenu();
+            this.menuCacheKey = key;
+        }
+        return this.menuCache;
+    }
+
     formatMenu() {
         const prefix = this.bot.prefix || '';
         
@@ -1,3 +1,11 @@
+const https = require('https');
+const http = require('http');
+const { performance } = require('perf_hooks');
+
+// Keep the probe connection warm so repeated pings measure latency, not handshakes
+const httpsAgent = new https.Agent({ keepAlive: true, maxSockets: 1 });
+const httpAgent = new http.Agent({ keepAlive: true, maxSockets: 1 });
+
 class PingPlugin {
     constructor(bot) {
         this.bot = bot;
@@ -13,7 +21,7 @@ class PingPlugin {
             const networkSpeed = await this.measureNetworkSpeed();
             const uptime = Math.floor((Date.now() - this.bot.startTime) / 1000);
             
-            const response = `🏓 Pong!\n⏱️ Uptime: ${this.formatUptime(uptime)}\n🌐 Network: ${networkSpeed}ms\n✅ Status: Online`;
+            const response = `🏓 Pong!\n⏱️ Uptime: ${this.formatUptime(uptime)}\n🌐 Network: ${networkSpeed}\n✅ Status: Online`;
             await this.bot.sendMessage(messageData.from, response);
             return true;
         } catch (error) {
@@ -24,19 +32,18 @@ class PingPlugin {
 
     async measureNetworkSpeed() {
         try {
-            const startTime = Date.now();
+            const startTime = performance.now();
             
             await new Promise((resolve, reject) => {
-                const https = require('https');
-                const req = https.get('https://www.google.com', (res) => {
-                    res.on('data', () => {});
+                // HEAD request - only the headers are needed to time the round trip
+                const req = https.request('https://www.google.com', { method: 'HEAD', agent: httpsAgent }, (res) => {
+                    res.resume();
                     res.on('end', resolve);
                 });
                 req.on('error', () => {
                     // Fallback to localhost health check
-                    const http = require('http');
-                    const fallbackReq = http.get('http://localhost:8080/health', (res) => {
-                        res.on('data', () => {});
+                    const fallbackReq = http.request('http://localhost:8080/health', { method: 'HEAD', agent: httpAgent }, (res) => {
+                        res.resume();
                         res.on('end', resolve);
                     });
                     fallbackReq.on('error', reject);
@@ -44,15 +51,17 @@ class PingPlugin {
                         fallbackReq.destroy();
                         reject(new Error('Timeout'));
                     });
+                    fallbackReq.end();
                 });
                 req.setTimeout(3000, () => {
                     req.destroy();
                     // Don't reject immediately, let the fallback handle it
                 });
+                req.end();
             });
             
-            const endTime = Date.now();
-            const latency = endTime - startTime;
+            const endTime = performance.now();
+            const latency = Math.round(endTime - startTime);
             return `${latency}ms`;
             
         } catch (error) {
@@ -11,8 +11,9 @@ class PluginManager {
     async loadPlugins() {
         try {
             const pluginsDir = path.join(__dirname);
-            const pluginFiles = fs.readdirSync(pluginsDir)
-                .filter(file => file.endsWith('.js') && file !== 'pluginManager.js');
+            const pluginFiles = fs.readdirSync(pluginsDir, { withFileTypes: true })
+                .filter(entry => entry.isFile() && entry.name.endsWith('.js') && entry.name !== 'pluginManager.js')
+                .map(entry => entry.name);
 
             console.log(`🔌 Loading ${pluginFiles.length} plugins...`);
 
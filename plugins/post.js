@@ -5,6 +5,7 @@ const { promisify } = require('util');
 const { downloadMediaMessage } = require('../utils/baileys-hybrid');
 
 const execAsync = promisify(exec);
+const FILE_SIZE_UNITS = ['B', 'KB', 'MB', 'GB', 'TB'];
 
 class PostPlugin {
     constructor(bot) {
@@ -15,6 +16,7 @@ class PostPlugin {
         this.emoji = '📢';
         this.cooldown = 10000; // 10 second cooldown for status posts
         this.userCooldowns = new Map();
+        this.maxCooldownEntries = 500;
     }
 
     // Helper function to check cooldown
@@ -27,17 +29,28 @@ class PostPlugin {
             return { onCooldown: true, remaining };
         }
         
+        // Every entry uses the same cooldown, so insertion order is expiry order:
+        // drop expired entries from the front and evict the oldest past the cap
+        this.userCooldowns.delete(userId);
+        for (const [key, end] of this.userCooldowns) {
+            if (end > now && this.userCooldowns.size < this.maxCooldownEntries) break;
+            this.userCooldowns.delete(key);
+        }
+        
         this.userCooldowns.set(userId, now + this.cooldown);
         return { onCooldown: false };
     }
 
     // Helper function to format file size
     formatFileSize(bytes) {
-        if (bytes === 0) return '0 B';
-        const k = 1024;
-        const sizes = ['B', 'KB', 'MB', 'GB'];
-        const i = Math.floor(Math.log(bytes) / Math.log(k));
-        return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+        if (bytes <= 0) return '0 B';
+        let i = 0;
+        let size = bytes;
+        while (size >= 1024 && i < FILE_SIZE_UNITS.length - 1) {
+            size /= 1024;
+            i++;
+        }
+        return parseFloat(size.toFixed(2)) + ' ' + FILE_SIZE_UNITS[i];
     }
 
     // Helper function to get video duration using ffprobe
@@ -1,6 +1,24 @@
 const fs = require('fs').promises;
+const { createWriteStream } = require('fs');
+const { pipeline } = require('stream/promises');
+const https = require('https');
+const http = require('http');
 const path = require('path');
-const Tiktok = require("@tobyg74/tiktok-api-dl");
+let Tiktok = null; // @tobyg74/tiktok-api-dl, loaded on first download
+
+// Static values shared by every download
+const REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+};
+const FILE_SIZE_UNITS = ['B', 'KB', 'MB', 'GB', 'TB'];
+const MAX_VIDEO_SIZE = 64 * 1024 * 1024; // WhatsApp limit for videos
+const WRITE_BUFFER_SIZE = 1024 * 1024; // Batch disk writes into 1MB chunks
+const SHORT_LINK_PATTERN = /vt\.tiktok\.com\/([^/?#]+)/;
+const POST_ID_PATTERN = /\/(?:video|photo)\/(\d+)/;
+
+// Reuse connections to the TikTok CDN across HEAD and GET requests
+const httpsAgent = new https.Agent({ keepAlive: true, maxSockets: 10 });
+const httpAgent = new http.Agent({ keepAlive: true, maxSockets: 10 });
 
 class TikTokPlugin {
     constructor(bot) {
@@ -11,7 +29,13 @@ class TikTokPlugin {
         this.emoji = '🎵';
         this.cooldown = 5000; // 5 second cooldown
         this.userCooldowns = new Map();
+        this.maxCooldownEntries = 500;
         this.version = "v3"; // Using v3 API version for direct video URLs
+        this.resolvedLinks = new Map(); // Short link -> canonical URL
+        this.maxResolvedLinks = 500;
+        this.lookupCache = new Map(); // Post id (or URL) -> { promise, expires }
+        this.lookupCacheTTL = 5 * 60 * 1000; // 5 minutes, media URLs are signed and expire
+        this.maxLookupCacheEntries = 200;
     }
 
     // Helper function to check cooldown
@@ -24,24 +48,61 @@ class TikTokPlugin {
             return { onCooldown: true, remaining };
         }
         
+        // Every entry uses the same cooldown, so insertion order is expiry order:
+        // drop expired entries from the front and evict the oldest past the cap
+        this.userCooldowns.delete(userId);
+        for (const [key, end] of this.userCooldowns) {
+            if (end > now && this.userCooldowns.size < this.maxCooldownEntries) break;
+            this.userCooldowns.delete(key);
+        }
+        
         this.userCooldowns.set(userId, now + this.cooldown);
         return { onCooldown: false };
     }
 
+    // Helper function to resolve a short link to its canonical URL with one HEAD request
+    async resolveShortLink(url) {
+        if (this.resolvedLinks.has(url)) {
+            return this.resolvedLinks.get(url);
+        }
+        
+        const location = await new Promise((resolve) => {
+            const request = https.request(url, { method: 'HEAD', headers: REQUEST_HEADERS, agent: httpsAgent, timeout: 10000 }, (response) => {
+                response.resume();
+                resolve(response.headers.location || null);
+            });
+            request.on('timeout', () => request.destroy());
+            request.on('error', () => resolve(null));
+            request.end();
+        });
+        
+        if (location) {
+            // Keep the cache bounded by dropping the oldest entry
+            if (this.resolvedLinks.size >= this.maxResolvedLinks) {
+                this.resolvedLinks.delete(this.resolvedLinks.keys().next().value);
+            }
+            this.resolvedLinks.set(url, location);
+        }
+        
+        return location;
+    }
+
     // Helper function to extract TikTok URL variations
-    getTikTokUrlVariations(originalUrl) {
+    async getTikTokUrlVariations(originalUrl) {
         const variations = [originalUrl];
         
         // Handle shortened URLs (vt.tiktok.com)
-        if (originalUrl.includes('vt.tiktok.com')) {
-            // Extract short code properly handling trailing slash
-            const shortCode = originalUrl.replace(/\/$/, '').split('/').pop().split('?')[0];
-            if (shortCode) {
+        // Extract the short code in one pass, ignoring trailing slash and query
+        const shortLink = SHORT_LINK_PATTERN.exec(originalUrl);
+        if (shortLink) {
+            const shortCode = shortLink[1];
+            const resolved = await this.resolveShortLink(`https://vt.tiktok.com/${shortCode}/`);
+            
+            // Prefer the canonical video URL the short link redirects to
+            if (resolved) {
+                variations.unshift(resolved);
+            } else {
                 variations.push(`https://www.tiktok.com/t/${shortCode}`);
-                
-                // Try case variations for the short code
-                variations.push(`https://vt.tiktok.com/${shortCode.toUpperCase()}/`);
-                variations.push(`https://vt.tiktok.com/${shortCode.toLowerCase()}/`);
             }
         }
         
@@ -50,11 +111,14 @@ class TikTokPlugin {
 
     // Helper function to format file size
     formatFileSize(bytes) {
-        if (bytes === 0) return '0 B';
-        const k = 1024;
-        const sizes = ['B', 'KB', 'MB', 'GB'];
-        const i = Math.floor(Math.log(bytes) / Math.log(k));
-        return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+        if (bytes <= 0) return '0 B';
+        let i = 0;
+        let size = bytes;
+        while (size >= 1024 && i < FILE_SIZE_UNITS.length - 1) {
+            size /= 1024;
+            i++;
+        }
+        return parseFloat(size.toFixed(2)) + ' ' + FILE_SIZE_UNITS[i];
     }
 
     // Helper function to format duration
@@ -65,60 +129,54 @@ class TikTokPlugin {
         return minutes > 0 ? `${minutes}:${remainingSeconds.toString().padStart(2, '0')}` : `${seconds}s`;
     }
 
+    // Helper function to stream a remote file to disk, returns the reported size
+    async downloadToFile(url, outputFile) {
+        const isHttps = url.startsWith('https://');
+        const client = isHttps ? https : http;
+        const agent = isHttps ? httpsAgent : httpAgent;
+        const response = await new Promise((resolve, reject) => {
+            client.get(url, { headers: REQUEST_HEADERS, agent }, resolve).on('error', reject);
+        });
+        
+        if (response.statusCode !== 200) {
+            response.resume();
+            throw new Error(`HTTP ${response.statusCode}: ${response.statusMessage}`);
+        }
+        
+        try {
+            await pipeline(response, createWriteStream(outputFile, { highWaterMark: WRITE_BUFFER_SIZE }));
+        } catch (error) {
+            await fs.unlink(outputFile).catch(() => {});
+            throw error;
+        }
+        
+        return parseInt(response.headers['content-length'] || '0');
+    }
+
     // Download image carousel from TikTok
     async downloadImageCarousel(contentInfo) {
         try {
             console.log(`🖼️ Starting image carousel download: ${contentInfo.images.length} images`);
             
             const timestamp = Date.now();
-            const imageFiles = [];
-            const https = require('https');
-            const http = require('http');
             
-            // Download each image
-            for (let i = 0; i < contentInfo.images.length; i++) {
-                const imageUrl = contentInfo.images[i];
+            // Download all images concurrently, keeping carousel order
+            const downloads = await Promise.all(contentInfo.images.map(async (imageUrl, i) => {
                 const outputFile = `downloads/tiktok_image_${timestamp}_${i + 1}.jpg`;
                 
                 console.log(`📥 Downloading image ${i + 1}/${contentInfo.images.length}: ${imageUrl}`);
                 
                 try {
-                    await new Promise((resolve, reject) => {
-                        const client = imageUrl.startsWith('https://') ? https : http;
-                        
-                        client.get(imageUrl, {
-                            headers: {
-                                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                            }
-                        }, (response) => {
-                            if (response.statusCode !== 200) {
-                                reject(new Error(`HTTP ${response.statusCode}: ${response.statusMessage}`));
-                                return;
-                            }
-                            
-                            const fileStream = require('fs').createWriteStream(outputFile);
-                            response.pipe(fileStream);
-                            
-                            fileStream.on('finish', () => {
-                                fileStream.close();
-                                imageFiles.push(outputFile);
-                                console.log(`✅ Downloaded image ${i + 1}: ${outputFile}`);
-                                resolve();
-                            });
-                            
-                            fileStream.on('error', (error) => {
-                                fs.unlink(outputFile).catch(() => {});
-                                reject(error);
-                            });
-                        }).on('error', (error) => {
-                            reject(error);
-                        });
-                    });
+                    await this.downloadToFile(imageUrl, outputFile);
+                    console.log(`✅ Downloaded image ${i + 1}: ${outputFile}`);
+                    return outputFile;
                 } catch (error) {
                     console.log(`❌ Failed to download image ${i + 1}: ${error.message}`);
                     // Continue with other images
+                    return null;
                 }
-            }
+            }));
+            const imageFiles = downloads.filter(Boolean);
             
             if (imageFiles.length === 0) {
                 throw new Error('No images could be downloaded');
@@ -152,14 +210,13 @@ class TikTokPlugin {
             const imageBuffers = [];
             for (const imageFile of result.image_files) {
                 try {
-                    const stats = await fs.stat(imageFile);
                     const buffer = await fs.readFile(imageFile);
                     imageBuffers.push({
                         image: buffer,
                         fileName: path.basename(imageFile),
                         mimetype: 'image/jpeg'
                     });
-                    console.log(`✅ Prepared image: ${imageFile} (${this.formatFileSize(stats.size)})`);
+                    console.log(`✅ Prepared image: ${imageFile} (${this.formatFileSize(buffer.length)})`);
                 } catch (error) {
                     console.log(`❌ Failed to read image ${imageFile}: ${error.message}`);
                 }
@@ -223,10 +280,7 @@ class TikTokPlugin {
             const stats = await fs.stat(result.output_file);
             const fileSize = stats.size;
             
-            // WhatsApp file size limit is 64MB for videos
-            const maxSize = 64 * 1024 * 1024; // 64MB in bytes
-            
-            if (fileSize > maxSize) {
+            if (fileSize > MAX_VIDEO_SIZE) {
                 await this.bot.sendMessage(userId, `❌ Video is too large (${this.formatFileSize(fileSize)}). WhatsApp supports videos up to 64MB.`);
                 
                 // Clean up large file
@@ -236,7 +290,6 @@ class TikTokPlugin {
             
             // Send the video
             console.log(`📤 Preparing to send video: ${result.output_file} (${this.formatFileSize(fileSize)})`);
-            const videoBuffer = await fs.readFile(result.output_file);
             
             // Create caption with available information
             let caption = `✅ *TIKTOK VIDEO DOWNLOADED*\n\n📝 Title: ${result.title}\n👤 Author: ${result.author}\n⏱️ Duration: ${this.formatDuration(result.duration)}\n📊 Size: ${this.formatFileSize(fileSize)}`;
@@ -248,7 +301,7 @@ class TikTokPlugin {
             }
             
             const videoMessage = {
-                video: videoBuffer,
+                video: { url: result.output_file }, // Streamed from disk by Baileys
                 caption: caption,
                 gifPlayback: false,
                 fileName: path.basename(result.output_file),
@@ -283,156 +336,181 @@ class TikTokPlugin {
         }
     }
 
+    // Look up the preferred URL first and only fan out to the fallbacks if it fails
+    async lookupTikTok(urlVariations) {
+        if (!Tiktok) {
+            Tiktok = require("@tobyg74/tiktok-api-dl");
+        }
+        
+        // Try each URL variation in order
+        let lastError;
+        for (const testUrl of urlVariations) {
+            console.log(`🔄 Trying URL: ${testUrl}`);
+            
+            try {
+                const result = await Tiktok.Downloader(testUrl, {
+                    version: this.version,
+                    showOriginalResponse: false
+                });
+                
+                if (result && result.status === "success" && result.result) {
+                    return result.result;
+                }
+                
+                lastError = new Error(result?.message || `No result for ${testUrl}`);
+                console.log(`❌ Failed with URL ${testUrl}: ${lastError.message}`);
+            } catch (error) {
+                lastError = error;
+                console.log(`❌ Failed with URL ${testUrl}: ${error.message}`);
+            }
+        }
+        
+        // If we get here, no URL worked
+        throw new Error(lastError?.message || 'Failed to download from any URL variation');
+    }
+
+    // Share one lookup per post so repeated or concurrent requests skip the API call
+    async getTikTokData(url) {
+        const urlVariations = await this.getTikTokUrlVariations(url);
+        
+        // Key on the post id when the canonical URL exposes it, so different links to one post share an entry
+        const postId = urlVariations.map(variation => POST_ID_PATTERN.exec(variation)).find(Boolean);
+        const key = postId ? postId[1] : url;
+        
+        const now = Date.now();
+        const cached = this.lookupCache.get(key);
+        if (cached && cached.expires > now) {
+            console.log(`♻️ Using cached TikTok lookup: ${key}`);
+            return { key, data: await cached.promise };
+        }
+        
+        const promise = this.lookupTikTok(urlVariations);
+        
+        // Failed lookups are not cached
+        promise.catch(() => this.evictTikTokData(key, promise));
+        
+        this.lookupCache.delete(key);
+        if (this.lookupCache.size >= this.maxLookupCacheEntries) {
+            this.lookupCache.delete(this.lookupCache.keys().next().value);
+        }
+        this.lookupCache.set(key, { promise, expires: now + this.lookupCacheTTL });
+        
+        return { key, data: await promise };
+    }
+
+    // Drop a cached lookup, optionally only if it is still the given promise
+    evictTikTokData(key, promise = null) {
+        const cached = this.lookupCache.get(key);
+        if (cached && (!promise || cached.promise === promise)) {
+            this.lookupCache.delete(key);
+        }
+    }
+
     // Main download function using @tobyg74/tiktok-api-dl
     async downloadTikTokVideo(url) {
+        let cacheKey = null;
         try {
             console.log(`🎵 Starting TikTok download using npm package: ${url}`);
             
-            const urlVariations = this.getTikTokUrlVariations(url);
-            let lastError = null;
+            const lookup = await this.getTikTokData(url);
+            cacheKey = lookup.key;
+            const data = lookup.data;
+            console.log(`🔍 API Response structure:`, JSON.stringify(data, null, 2));
+            
+            // Extract content information from different API response structures
+            const contentInfo = {
+                title: data.title || data.desc || 'TikTok Content',
+                author: typeof data.author === 'object' ? data.author?.nickname?.replace('@', '') || 'Unknown' : data.author || 'Unknown',
+                video_id: data.video_id || data.id || 'unknown',
+                duration: data.duration || data.video?.duration || 0,
+                description: data.description || data.desc || data.title || '',
+                stats: {
+                    views: data.play_count || data.statistics?.playCount || data.playCount || 0,
+                    likes: data.digg_count || data.statistics?.diggCount || data.diggCount || 0,
+                    comments: data.comment_count || data.statistics?.commentCount || data.commentCount || 0,
+                    shares: data.share_count || data.statistics?.shareCount || data.shareCount || 0
+                },
+                // Check if this is an image carousel
+                images: data.images || data.imageSlideShow || []
+            };
             
-            // Try each URL variation
-            for (const testUrl of urlVariations) {
-                try {
-                    console.log(`🔄 Trying URL: ${testUrl}`);
-                    
-                    const result = await Tiktok.Downloader(testUrl, {
-                        version: this.version,
-                        showOriginalResponse: false
-                    });
-                    
-                    if (result && result.status === "success" && result.result) {
-                        const data = result.result;
-                        console.log(`🔍 API Response structure:`, JSON.stringify(data, null, 2));
-                        
-                        // Extract content information from different API response structures
-                        const contentInfo = {
-                            title: data.title || data.desc || 'TikTok Content',
-                            author: typeof data.author === 'object' ? data.author?.nickname?.replace('@', '') || 'Unknown' : data.author || 'Unknown',
-                            video_id: data.video_id || data.id || 'unknown',
-                            duration: data.duration || data.video?.duration || 0,
-                            description: data.description || data.desc || data.title || '',
-                            stats: {
-                                views: data.play_count || data.statistics?.playCount || data.playCount || 0,
-                                likes: data.digg_count || data.statistics?.diggCount || data.diggCount || 0,
-                                comments: data.comment_count || data.statistics?.commentCount || data.commentCount || 0,
-                                shares: data.share_count || data.statistics?.shareCount || data.shareCount || 0
-                            },
-                            // Check if this is an image carousel
-                            images: data.images || data.imageSlideShow || []
-                        };
-                        
-                        // Check if this is an image carousel (slideshow)
-                        if (contentInfo.images && contentInfo.images.length > 0) {
-                            console.log(`🖼️ Detected image carousel with ${contentInfo.images.length} images`);
-                            return await this.downloadImageCarousel(contentInfo);
-                        }
-                        
-                        // Handle video content
-                        let videoUrl = null;
-                        
-                        console.log(`🔍 V3 API Response - Available video URLs:`, {
-                            hasVideoSD: !!data.videoSD,
-                            hasVideoHD: !!data.videoHD,
-                            hasVideoWatermark: !!data.videoWatermark,
-                            hasImages: !!(data.images || data.imageSlideShow),
-                            dataKeys: Object.keys(data)
-                        });
-                        
-                        // V3 API provides direct video URLs - prefer HD, fallback to SD
-                        if (data.videoHD) {
-                            videoUrl = data.videoHD;
-                            console.log(`✅ Using HD video: ${videoUrl}`);
-                        } else if (data.videoSD) {
-                            videoUrl = data.videoSD;
-                            console.log(`✅ Using SD video: ${videoUrl}`);
-                        } else if (data.videoWatermark) {
-                            videoUrl = data.videoWatermark;
-                            console.log(`✅ Using watermarked video: ${videoUrl}`);
-                        }
-                        
-                        // Fallback for other API versions
-                        else if (data.playUrl && Array.isArray(data.playUrl) && data.playUrl.length > 0) {
-                            videoUrl = data.playUrl[0];
-                            console.log(`✅ Fallback: Found video URL in playUrl[0]: ${videoUrl}`);
-                        }
-                        else if (data.video) {
-                            if (data.video.noWatermark) {
-                                videoUrl = data.video.noWatermark;
-                                console.log(`✅ Fallback: Found video URL in video.noWatermark: ${videoUrl}`);
-                            } else if (data.video.watermark) {
-                                videoUrl = data.video.watermark;
-                                console.log(`✅ Fallback: Found video URL in video.watermark: ${videoUrl}`);
-                            }
-                        }
-                        
-                        if (!videoUrl) {
-                            throw new Error('No video download URL found');
-                        }
-                        
-                        // Generate unique filename
-                        const timestamp = Date.now();
-                        const outputFile = `downloads/tiktok_${timestamp}.mp4`;
-                        
-                        // Download the video
-                        console.log(`📥 Downloading video from: ${videoUrl}`);
-                        
-                        const https = require('https');
-                        const http = require('http');
-                        
-                        const downloadPromise = new Promise((resolve, reject) => {
-                            const client = videoUrl.startsWith('https://') ? https : http;
-                            
-                            client.get(videoUrl, {
-                                headers: {
-                                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                                }
-                            }, (response) => {
-                                if (response.statusCode !== 200) {
-                                    reject(new Error(`HTTP ${response.statusCode}: ${response.statusMessage}`));
-                                    return;
-                                }
-                                
-                                const fileStream = require('fs').createWriteStream(outputFile);
-                                const totalSize = parseInt(response.headers['content-length'] || '0');
-                                
-                                response.pipe(fileStream);
-                                
-                                fileStream.on('finish', () => {
-                                    fileStream.close();
-                                    resolve({
-                                        success: true,
-                                        ...contentInfo,
-                                        type: 'video',
-                                        file_size: totalSize,
-                                        output_file: outputFile
-                                    });
-                                });
-                                
-                                fileStream.on('error', (error) => {
-                                    fs.unlink(outputFile).catch(() => {});
-                                    reject(error);
-                                });
-                            }).on('error', (error) => {
-                                reject(error);
-                            });
-                        });
-                        
-                        return await downloadPromise;
-                    }
-                    
-                } catch (error) {
-                    console.log(`❌ Failed with URL ${testUrl}: ${error.message}`);
-                    lastError = error;
-                    continue;
+            // Check if this is an image carousel (slideshow)
+            if (contentInfo.images && contentInfo.images.length > 0) {
+                console.log(`🖼️ Detected image carousel with ${contentInfo.images.length} images`);
+                const carousel = await this.downloadImageCarousel(contentInfo);
+                if (!carousel.success) {
+                    // Image URLs may have expired, refetch on the next request
+                    this.evictTikTokData(cacheKey);
                 }
+                return carousel;
             }
             
-            // If we get here, no URL worked
-            throw new Error(lastError?.message || 'Failed to download from any URL variation');
+            // Handle video content
+            let videoUrl = null;
+            
+            console.log(`🔍 V3 API Response - Available video URLs:`, {
+                hasVideoSD: !!data.videoSD,
+                hasVideoHD: !!data.videoHD,
+                hasVideoWatermark: !!data.videoWatermark,
+                hasImages: !!(data.images || data.imageSlideShow),
+                dataKeys: Object.keys(data)
+            });
+            
+            // V3 API provides direct video URLs - prefer HD, fallback to SD
+            if (data.videoHD) {
+                videoUrl = data.videoHD;
+                console.log(`✅ Using HD video: ${videoUrl}`);
+            } else if (data.videoSD) {
+                videoUrl = data.videoSD;
+                console.log(`✅ Using SD video: ${videoUrl}`);
+            } else if (data.videoWatermark) {
+                videoUrl = data.videoWatermark;
+                console.log(`✅ Using watermarked video: ${videoUrl}`);
+            }
+            
+            // Fallback for other API versions
+            else if (data.playUrl && Array.isArray(data.playUrl) && data.playUrl.length > 0) {
+                videoUrl = data.playUrl[0];
+                console.log(`✅ Fallback: Found video URL in playUrl[0]: ${videoUrl}`);
+            }
+            else if (data.video) {
+                if (data.video.noWatermark) {
+                    videoUrl = data.video.noWatermark;
+                    console.log(`✅ Fallback: Found video URL in video.noWatermark: ${videoUrl}`);
+                } else if (data.video.watermark) {
+                    videoUrl = data.video.watermark;
+                    console.log(`✅ Fallback: Found video URL in video.watermark: ${videoUrl}`);
+                }
+            }
+            
+            if (!videoUrl) {
+                throw new Error('No video download URL found');
+            }
+            
+            // Generate unique filename
+            const timestamp = Date.now();
+            const outputFile = `downloads/tiktok_${timestamp}.mp4`;
+            
+            // Download the video
+            console.log(`📥 Downloading video from: ${videoUrl}`);
+            
+            const totalSize = await this.downloadToFile(videoUrl, outputFile);
+            
+            return {
+                success: true,
+                ...contentInfo,
+                type: 'video',
+                file_size: totalSize,
+                output_file: outputFile
+            };
             
         } catch (error) {
             console.error(`❌ TikTok download error: ${error.message}`);
+            
+            // A failed media fetch (e.g. 403 on an expired signed URL) must not be served from cache again
+            if (cacheKey) {
+                this.evictTikTokData(cacheKey);
+            }
             return { 
                 success: false, 
                 error: `Download failed: ${error.message}` 
@@ -1,6 +1,8 @@
 // Hybrid Baileys approach - using each library for its strengths
 // This module provides the best functions from each Baileys variant
 
+const { randomBytes } = require('crypto');
+
 // === CORE CONNECTION & MESSAGE HANDLING ===
 // Use @whiskeysockets/baileys for stable connection and decryption
 const { 
@@ -10,10 +12,6 @@ const {
     fetchLatestBaileysVersion 
 } = require('@whiskeysockets/baileys');
 
-// === INTERACTIVE FEATURES ===
-// Use baileys-x for advanced interactive capabilities
-const BaileysX = require('baileys-x');
-
 // === MEDIA HANDLING ===
 // Try multiple libraries for media operations with fallbacks
 let downloadMediaMessage, getContentType;
@@ -138,7 +136,7 @@ const createHybridSocket = (options = {}) => {
                                             rows: buttons.map(btn => ({
                                                 title: btn.text || btn.displayText,
                                                 description: btn.description || btn.text,
-                                                id: btn.id || `btn_${Math.random().toString(36).substr(2, 9)}`
+                                                id: btn.id || `btn_${randomBytes(4).toString('hex')}`
                                             }))
                                         }]
                                     })
@@ -202,10 +200,10 @@ module.exports = {
     // Interactive features (enhanced)
     createModernInteractiveMessage,
     
-    // Access to individual libraries if needed
+    // Access to individual libraries if needed (loaded on first access)
     libraries: {
-        whiskeySockets: require('@whiskeysockets/baileys'),
-        baileysX: require('baileys-x'),
-        adiwajshing: require('@adiwajshing/baileys')
+        get whiskeySockets() { return require('@whiskeysockets/baileys'); },
+        get baileysX() { return require('baileys-x'); },
+        get adiwajshing() { return require('@adiwajshing/baileys'); }
     }
 };
\ No newline at end of file
@@ -2,6 +2,9 @@
 // Based on WhatsApp Business API standards and Hybrid Baileys approach
 // Uses multiple Baileys variants for optimal performance
 
+const { randomBytes } = require('crypto');
+const { jidDecode, generateWAMessageFromContent, proto } = require('@whiskeysockets/baileys');
+
 class InteractiveUtils {
     constructor(sock) {
         this.sock = sock;
@@ -9,7 +12,7 @@ class InteractiveUtils {
 
     // Generate message ID for tracking
     generateId(prefix = 'msg') {
-        return `${prefix}_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
+        return `${prefix}_${Date.now()}_${randomBytes(4).toString('hex')}`;
     }
 
     // Enhanced JID validation and formatting with 2024 fix
@@ -50,8 +53,6 @@ class InteractiveUtils {
                 return { user: null, server: null };
             }
 
-            // Import jidDecode safely
-            const { jidDecode } = require('@whiskeysockets/baileys');
             const decoded = jidDecode(jid);
             
             if (!decoded || !decoded.user) {
@@ -81,8 +82,6 @@ class InteractiveUtils {
             
             try {
                 // Method 1: Use modern nativeFlow format (2024 working method)
-                const { generateWAMessageFromContent, proto } = require('@whiskeysockets/baileys');
-                
                 // Validate JID before creating message
                 const validJid = this.validateJid(jid);
                 if (!validJid) {